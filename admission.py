@@ -0,0 +1,220 @@
+"""
+Admission control and request deadlines for the scoring endpoints.
+
+Each worker process admits at most MAX_IN_FLIGHT scoring requests at once.
+Every request carries a deadline taken from the client's X-Request-Timeout-Ms
+header, minus any time already spent in a proxy or listen-backlog queue (from
+X-Request-Start). A request is shed immediately with a 503 + Retry-After when
+its estimated wait (requests ahead of it times the recent scoring time) would
+overrun that deadline, or when MAX_QUEUE requests are already waiting. Under
+sync gunicorn workers the queue lives in the listen backlog, so the
+X-Request-Start delay is what makes late requests shed there. The scoring code
+calls check_deadline() between stages so work nobody will read is dropped.
+
+Admitted scoring runs on a bounded thread pool sized to MAX_IN_FLIGHT
+(run_scoring), so under a threaded gunicorn worker the request threads stay
+free to answer health checks, static files and metadata inline. Scoring holds
+the GIL for most of its time (pandas result building, Python glue), so extra
+pool threads in one process add little; gunicorn.conf.py uses one scoring
+thread per worker and one worker per CPU instead.
+
+Limits are read from the environment:
+    MAX_IN_FLIGHT        concurrent scoring requests per worker (default: CPUs available
+                         to the process, honoring CPU affinity and cgroup quotas)
+    MAX_QUEUE            hard cap on requests waiting for a slot (default: 16 x MAX_IN_FLIGHT)
+    REQUEST_TIMEOUT_MS   deadline when the client sends none (default: 30000)
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+
+
+def available_cpus():
+    """CPUs this process may use: affinity mask, capped by a cgroup CPU quota if one is set."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = None
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            limit, period = f.read().split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: quota is -1 when unlimited
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f_quota, \
+                    open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f_period:
+                limit, period = int(f_quota.read()), int(f_period.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota is not None:
+        cpus = min(cpus, max(1, int(quota)))
+    return max(1, cpus)
+
+
+MAX_IN_FLIGHT = int(os.environ.get("MAX_IN_FLIGHT", available_cpus()))
+# Shedding is normally driven by the estimated wait against the deadline; this is only a backstop
+MAX_QUEUE = int(os.environ.get("MAX_QUEUE", 16 * MAX_IN_FLIGHT))
+DEFAULT_TIMEOUT_MS = int(os.environ.get("REQUEST_TIMEOUT_MS", 30000))
+MAX_TIMEOUT_MS = 120000
+RETRY_AFTER_SECONDS = 1
+
+TIMEOUT_HEADER = "X-Request-Timeout-Ms"
+REQUEST_START_HEADER = "X-Request-Start"
+
+
+class Overloaded(Exception):
+    """The worker's in-flight and queue limits are full."""
+
+
+class DeadlineExceeded(Exception):
+    """The client's deadline passed before the work finished."""
+
+
+_slots = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+# One pool thread per slot; a slot is held until its pool task finishes, so an admitted
+# request never waits for a thread
+_pool = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="scoring")
+_lock = threading.Lock()
+_service_seconds = 0.0  # moving average of slot hold time, 0 until the first completion
+SERVICE_TIME_SMOOTHING = 0.2
+_stats = {"admitted": 0, "completed": 0, "shed": 0, "expired": 0, "in_flight": 0, "queued": 0}
+
+
+def _count(key, delta=1):
+    with _lock:
+        _stats[key] += delta
+
+
+def stats():
+    with _lock:
+        return {**_stats, "service_ms": round(_service_seconds * 1000, 1), "max_in_flight": MAX_IN_FLIGHT, "max_queue": MAX_QUEUE, "scoring_threads": MAX_IN_FLIGHT}
+
+
+def _expire():
+    """Count the current request as expired once, however many stages notice."""
+    if not g.get("expired", False):
+        g.expired = True
+        _count("expired")
+
+
+def _record_service(seconds):
+    global _service_seconds
+    with _lock:
+        if _service_seconds == 0.0:
+            _service_seconds = seconds
+        else:
+            _service_seconds += SERVICE_TIME_SMOOTHING * (seconds - _service_seconds)
+
+
+def _queued_seconds():
+    """Time spent before this worker saw the request, from a proxy's X-Request-Start."""
+    value = request.headers.get(REQUEST_START_HEADER, "").removeprefix("t=")
+    try:
+        start = float(value)
+    except ValueError:
+        return 0.0
+    # Proxies send seconds, milliseconds or microseconds since the epoch
+    if start > 1e14:
+        start /= 1e6
+    elif start > 1e11:
+        start /= 1e3
+    return max(0.0, time.time() - start)
+
+
+def request_deadline():
+    """Monotonic-clock deadline for the current request."""
+    try:
+        budget_ms = int(request.headers.get(TIMEOUT_HEADER, DEFAULT_TIMEOUT_MS))
+    except ValueError:
+        budget_ms = DEFAULT_TIMEOUT_MS
+    budget = min(max(budget_ms, 0), MAX_TIMEOUT_MS) / 1000
+    return time.monotonic() + budget - _queued_seconds()
+
+
+def remaining():
+    """Seconds left before the current request's deadline (None outside a request)."""
+    if not has_request_context() or "deadline" not in g:
+        return None
+    return g.deadline - time.monotonic()
+
+
+def check_deadline():
+    """Stop scoring between stages once the client has given up. No-op outside a request."""
+    left = remaining()
+    if left is not None and left <= 0:
+        _expire()
+        raise DeadlineExceeded()
+
+
+@contextmanager
+def admitted():
+    """Hold one of this worker's scoring slots for the duration of the block."""
+    g.deadline = request_deadline()
+    check_deadline()
+    left = remaining()
+
+    with _lock:
+        # Requests ahead of this one drain MAX_IN_FLIGHT at a time, then it needs its own service time
+        ahead = _stats["queued"] + _stats["in_flight"]
+        estimated_wait = (ahead // MAX_IN_FLIGHT + 1) * _service_seconds
+        if _stats["queued"] >= MAX_QUEUE or estimated_wait > left:
+            _stats["shed"] += 1
+            raise Overloaded()
+        _stats["queued"] += 1
+    try:
+        acquired = _slots.acquire(timeout=max(0.0, remaining()))
+    finally:
+        _count("queued", -1)
+    if not acquired:
+        _expire()
+        raise DeadlineExceeded()
+
+    _count("admitted")
+    _count("in_flight")
+    started = time.monotonic()
+
+    def release(_=None):
+        _record_service(time.monotonic() - started)
+        _count("in_flight", -1)
+        _slots.release()
+
+    try:
+        yield
+        _count("completed")
+    finally:
+        # Scoring abandoned at the deadline keeps its slot (and pool thread) until it stops
+        pending = g.pop("scoring_future", None)
+        if pending is None:
+            release()
+        else:
+            pending.add_done_callback(release)
+
+
+def run_scoring(fn, *args, **kwargs):
+    """Run `fn` on the scoring pool and wait for it until the request's deadline.
+
+    The request context is carried over, so check_deadline() inside `fn` still
+    sees this request's deadline and stops the work after we give up on it.
+    """
+    future = _pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+    left = remaining()
+    try:
+        return future.result(timeout=None if left is None else max(0.0, left))
+    except TimeoutError:
+        if not future.cancel() and has_request_context():
+            # Still running: admitted() releases the slot when it finishes
+            g.scoring_future = future
+        _expire()
+        raise DeadlineExceeded()
@@ -1,19 +1,26 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import pandas as pd
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from sklearn.neighbors import NearestNeighbors
 from sklearn.impute import SimpleImputer
-from sklearn.metrics import euclidean_distances
 import numpy as np
 import os
-
-app = Flask(__name__, static_folder='.', static_url_path='')
+import json
+import hashlib
+import inspect
+from functools import lru_cache
+from admission import admitted, check_deadline, run_scoring, Overloaded, DeadlineExceeded, RETRY_AFTER_SECONDS
+from admission import stats as admission_stats
+from data_loader import DATASET_PATH, load_dataset, widen
+from http_cache import static_response, json_response, not_modified, compress_response, etag_for
+from search_index import build_search_index, search
+from similar_colleges import SIMILAR_TABLE_PATH, DEFAULT_K, build_neighbor_table, feature_version, load_neighbor_table
+
+# Static files go through serve_static (cache headers, and only .css/.js/.html)
+app = Flask(__name__, static_folder=None)
 CORS(app)  # Enable CORS for React frontend
-
-# Load and prepare data (same as claude_rag_recommender.py)
-merged = pd.read_csv("processed_data/merged_dataset.csv")
-df = merged.copy()
+app.after_request(compress_response)
 
 # Feature definitions
 numeric_features = [
@@ -48,6 +55,10 @@ numeric_features = [
 binary_features = ["HSI", "PBI", "AANAPII", "ANNHI", "HBCU", "TRIBAL", "NANTI"]
 categorical_features = ["State Abbreviation", "Region", "Institution Size Category Name", "Sector Name", "Highest Degree Offered Name"]
 
+# Load only what the serving path reads, with categorical/float32 dtypes (see data_loader.py)
+SERVING_COLUMNS = ["Unit ID", "Institution Name", "City", "MSI Status", "MSI Type"] + numeric_features + binary_features + categorical_features
+df = load_dataset(DATASET_PATH, SERVING_COLUMNS)
+
 # Prepare model
 key_features = [
     "Net Price",
@@ -56,6 +67,13 @@ key_features = [
 ] + binary_features + categorical_features
 
 df_model = df[numeric_features + binary_features + categorical_features].dropna(subset=key_features)
+# Drop categories with no rows left so get_dummies creates the same columns as before
+for col in categorical_features:
+    df_model[col] = df_model[col].cat.remove_unused_categories()
+# The model is fit in float64 on the exact CSV values, as before the compact schema
+for col in numeric_features:
+    if df_model[col].dtype == np.float32:
+        df_model[col] = widen(df_model[col])
 imputer = SimpleImputer(strategy='mean')
 df_model[numeric_features] = imputer.fit_transform(df_model[numeric_features])
 index_map = df_model.index
@@ -67,6 +85,154 @@ df_encoded[numeric_features] = scaler.fit_transform(df_encoded[numeric_features]
 knn = NearestNeighbors(metric="euclidean")
 knn.fit(df_encoded)
 
+# Net price by year: one (colleges x years) matrix whose columns the scoring kernel reads as views.
+# Built from the raw (pre-imputation) year columns; a college missing a year falls back to its own Net Price.
+# "trend" projects 2021-22 from the least-squares line through the observed years (at least two, else Net Price).
+PRICE_YEAR_COLUMNS = {
+    "current": "Net Price",
+    "2018-19": "Average Net Price After Grants, 2018-19",
+    "2019-20": "Average Net Price After Grants, 2019-20",
+    "2020-21": "Average Net Price After Grants, 2020-21",
+}
+PRICE_YEARS = list(PRICE_YEAR_COLUMNS) + ["trend"]
+PRICE_YEAR_INDEX = {year: i for i, year in enumerate(PRICE_YEARS)}
+# Encoded column the query encoder puts the student's budget in (trend uses the latest observed year)
+PRICE_QUERY_FEATURE = {**PRICE_YEAR_COLUMNS, "trend": PRICE_YEAR_COLUMNS["2020-21"]}
+
+def trend_prices(yearly, fallback):
+    """Per-row least-squares projection one year past `yearly` (NaN = not observed), clipped at 0."""
+    observed = ~np.isnan(yearly)
+    x = np.broadcast_to(np.arange(yearly.shape[1], dtype=np.float64), yearly.shape) * observed
+    y = np.where(observed, yearly, 0.0)
+    n = observed.sum(axis=1)
+    sx, sy, sxx, sxy = x.sum(axis=1), y.sum(axis=1), (x * x).sum(axis=1), (x * y).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+        projected = (sy - slope * sx) / n + slope * yearly.shape[1]
+    return np.clip(np.where(n >= 2, projected, fallback), 0, None)
+
+_net_price = df_model["Net Price"].to_numpy(dtype=np.float64)
+_raw_yearly = df.loc[index_map, list(PRICE_YEAR_COLUMNS.values())[1:]].to_numpy(dtype=np.float64)
+price_matrix = np.ascontiguousarray(np.column_stack([
+    _net_price,
+    np.where(np.isnan(_raw_yearly), _net_price[:, None], _raw_yearly),
+    trend_prices(_raw_yearly, _net_price),
+]))
+# The affordability gap is net price minus work income, so it shifts with the year's price
+_gap = df_model["Affordability Gap (net price minus income earned working 10 hrs at min wage)"].to_numpy(dtype=np.float64)
+gap_matrix = _gap[:, None] + (price_matrix - price_matrix[:, :1])
+
+def price_year_index(year):
+    if year not in PRICE_YEAR_INDEX:
+        raise ValueError(f"Unsupported priceYear '{year}'. Use one of: {', '.join(PRICE_YEARS)}")
+    return PRICE_YEAR_INDEX[year]
+
+def year_prices(year, index):
+    """Net price and affordability gap arrays for `year`, aligned with `index` (a subset of df_model rows)."""
+    j = price_year_index(year)
+    if index.equals(index_map):
+        return price_matrix[:, j], gap_matrix[:, j]
+    positions = index_map.get_indexer(index)
+    return price_matrix[positions, j], gap_matrix[positions, j]
+
+# Similar-colleges neighbor table: load the offline build, or build it in-process if missing/stale
+model_unit_ids = df.loc[index_map, "Unit ID"].to_numpy(dtype=np.int64)
+unit_id_to_pos = {uid: pos for pos, uid in enumerate(model_unit_ids)}
+similar_table = load_neighbor_table(
+    SIMILAR_TABLE_PATH, expected_unit_ids=model_unit_ids, expected_version=feature_version(knn._fit_X)
+)
+if similar_table is None:
+    similar_table = build_neighbor_table(knn._fit_X, model_unit_ids, k=DEFAULT_K)
+_, similar_neighbors, similar_distances = similar_table
+
+# Name/city search index, built once at startup over the scored institutions only,
+# so every Unit ID it returns works with /api/similar and the other endpoints
+_searchable = df.loc[index_map]
+search_index = build_search_index(
+    _searchable["Unit ID"], _searchable["Institution Name"], _searchable["City"], _searchable["State Abbreviation"]
+)
+SEARCH_MAX_LIMIT = 50
+
+# Facet group codes for the dashboards, aligned with df_model rows (-1 codes become "Unknown")
+FACET_COLUMNS = {
+    "state": "State Abbreviation",
+    "region": "Region",
+    "sector": "Sector Name",
+    "msiType": "MSI Type",
+}
+facet_codes = {}
+facet_labels = {}
+for facet, col in FACET_COLUMNS.items():
+    codes, labels = pd.factorize(df.loc[index_map, col], sort=True)
+    facet_codes[facet] = np.where(codes < 0, len(labels), codes)
+    facet_labels[facet] = labels.astype(str).tolist() + ["Unknown"]
+
+FACET_QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+FACET_SCORE_BINS = 20
+facet_retention = df_model["First-Time, Full-Time Retention Rate"].to_numpy()
+facet_grad_rate = df_model["Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total"].to_numpy()
+facet_pell_grad_rate = df_model["Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years"].to_numpy()
+
+# Columns returned for each college in API responses
+RESULT_COLUMNS = [
+    "Unit ID",
+    "Institution Name",
+    "State Abbreviation",
+    "Net Price",
+    "MSI Status",
+    "First-Time, Full-Time Retention Rate",
+    "Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total",
+    "Region",
+    "City",
+    "Affordability Gap (net price minus income earned working 10 hrs at min wage)",
+    "Percent of First-Time, Full-Time Undergraduates Awarded Pell Grants",
+    "Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years"
+]
+
+# Results only change with the data or the code that loads, scores and looks it up,
+# so all of them key the response ETags
+MODEL_SOURCES = [
+    DATASET_PATH,
+    __file__,
+    inspect.getsourcefile(load_dataset),
+    inspect.getsourcefile(build_neighbor_table),
+    inspect.getsourcefile(search),
+]
+_model_hash = hashlib.sha256()
+for source in MODEL_SOURCES:
+    with open(source, "rb") as f:
+        _model_hash.update(f.read())
+MODEL_VERSION = _model_hash.hexdigest()[:12]
+
+# Streaming responses: rows per chunk after the first top-N frame, and default/maximum rows streamed
+STREAM_CHUNK_SIZE = 50
+STREAM_DEFAULT_LIMIT = 200
+STREAM_MAX_LIMIT = 1000
+
+# Precomputed metadata responses
+METADATA_MAX_AGE = 3600
+
+def _rounded_range(col, step):
+    values = df_model[col]
+    return {
+        "min": float(np.floor(values.min() / step) * step),
+        "max": float(np.ceil(values.max() / step) * step),
+        "step": step
+    }
+
+states_body = json.dumps(sorted(df['State Abbreviation'].dropna().unique().tolist())).encode()
+meta_body = json.dumps({
+    "modelVersion": MODEL_VERSION,
+    "states": json.loads(states_body),
+    "msiTypes": binary_features,
+    "sliders": {
+        "maxNetPrice": _rounded_range("Net Price", 1000),
+        "minGradRate": _rounded_range("Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total", 5),
+        "minRetention": _rounded_range("First-Time, Full-Time Retention Rate", 5),
+        "topN": {"min": 5, "max": 20, "step": 1}
+    }
+}).encode()
+
 # Helper functions
 def convert_preferences_to_weights(user_input):
     """🎯 MISSION-ALIGNED: Includes Pell focus & Affordability Gap weighting!"""
@@ -82,89 +248,113 @@ def convert_preferences_to_weights(user_input):
     weights["MSI_preferences"] = user_input.get("MSI_preferences", [])
     weights["preferred_state"] = user_input.get("preferred_state", None)
     weights["focus_pell"] = user_input.get("focus_pell", False)  # 🎯 Focus on Pell students
+    weights["price_year"] = user_input.get("price_year", "current")
     return weights
 
-def compute_weighted_scores(df_clean, weights):
-    """🎯 MISSION-ALIGNED: Includes Affordability Gap & Pell-focused graduation rates!"""
-    score = pd.Series(0.0, index=df_clean.index)
-    STATE_PREFERENCE_BONUS = 15000.0
-    MSI_PREFERENCE_BONUS = 5000.0
+# Bonus constants on the same scale as 'Net Price' (tune with sweep.py)
+STATE_PREFERENCE_BONUS = 15000.0
+MSI_PREFERENCE_BONUS = 5000.0
+GRAD_RATE_BONUS_MULTIPLIER = 10.0
+RETENTION_BONUS_MULTIPLIER = 10.0
 
-    # Apply base weights
-    base_features = ["Net Price", "First-Time, Full-Time Retention Rate"]
-    
+def compute_preference_scores(df_clean, weights):
+    """Weighted-score terms that do not depend on the net price year.
+
+    Plain NumPy on the column arrays, so the work stays in vectorized kernels.
+    """
+    retention = df_clean["First-Time, Full-Time Retention Rate"].to_numpy()
     # 🎯 MISSION-ALIGNED: Use Pell-specific grad rate if requested
     if weights.get("focus_pell", False):
-        base_features.append("Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years")
+        grad_col = "Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years"
     else:
-        base_features.append("Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total")
-    
-    for feat in base_features:
-        if feat in df_clean.columns and feat in weights:
-            score += weights[feat] * df_clean[feat]
-    
-    # 🎯 MISSION-ALIGNED: Penalize high Affordability Gap (lower gap is better)
-    if "Affordability Gap (net price minus income earned working 10 hrs at min wage)" in df_clean.columns:
-        score += weights.get("Affordability Gap", -0.3) * df_clean["Affordability Gap (net price minus income earned working 10 hrs at min wage)"]
+        grad_col = "Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total"
+    grad_rate = df_clean[grad_col].to_numpy()
 
-    if "_max_net_price" in weights:
-        penalty = df_clean["Net Price"] - weights["_max_net_price"]
-        penalty = penalty.apply(lambda x: x if x > 0 else 0)
-        score -= penalty * 1.0
+    # Apply base weights
+    score = weights["First-Time, Full-Time Retention Rate"] * retention
+    score = score + weights[grad_col] * grad_rate
 
-    # Bonus for exceeding min grad rate - 🎯 Use Pell-specific grad rate if focus_pell is enabled
+    # Bonus for exceeding the minimums - 🎯 on the Pell-specific grad rate if focus_pell is enabled
     if "_min_grad_rate" in weights:
-        if weights.get("focus_pell", False) and "Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years" in df_clean.columns:
-            grad_col = "Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years"
-        else:
-            grad_col = "Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total"
-        
-        bonus = df_clean[grad_col] - weights["_min_grad_rate"]
-        bonus = bonus.apply(lambda x: x if x > 0 else 0)
-        score += bonus * 10.0
-
+        score = score + np.maximum(grad_rate - weights["_min_grad_rate"], 0) * GRAD_RATE_BONUS_MULTIPLIER
     if "_min_retention" in weights:
-        bonus = df_clean["First-Time, Full-Time Retention Rate"] - weights["_min_retention"]
-        bonus = bonus.apply(lambda x: x if x > 0 else 0)
-        score += bonus * 10.0
+        score = score + np.maximum(retention - weights["_min_retention"], 0) * RETENTION_BONUS_MULTIPLIER
 
     for msi in weights["MSI_preferences"]:
         if msi in df_clean.columns:
-            score += df_clean[msi] * MSI_PREFERENCE_BONUS
+            score = score + df_clean[msi].to_numpy() * MSI_PREFERENCE_BONUS
 
-    if weights["preferred_state"] and "State Abbreviation" in df_clean.columns:
-        is_preferred_state = (df_clean["State Abbreviation"] == weights["preferred_state"]).astype(float)
-        score += is_preferred_state * STATE_PREFERENCE_BONUS
+    if weights["preferred_state"]:
+        is_preferred_state = (df_clean["State Abbreviation"] == weights["preferred_state"]).to_numpy(dtype=float)
+        score = score + is_preferred_state * STATE_PREFERENCE_BONUS
 
+    return pd.Series(score, index=df_clean.index)
+
+def compute_price_scores(price, gap, weights):
+    """Net price terms of the weighted score; `price`/`gap` may be one year or a (colleges x years) matrix."""
+    score = weights["Net Price"] * price
+    # 🎯 MISSION-ALIGNED: Penalize high Affordability Gap (lower gap is better)
+    score = score + weights.get("Affordability Gap", -0.3) * gap
+    if "_max_net_price" in weights:
+        score = score - np.maximum(price - weights["_max_net_price"], 0) * 1.0
     return score
 
-def knn_similarity(user_input):
-    """🎯 MISSION-ALIGNED: Includes Pell Grant Rate & Affordability Gap in KNN!"""
-    vec = pd.DataFrame(0, index=[0], columns=df_encoded.columns)
-    
-    numeric_input = pd.Series(index=numeric_features, dtype=float)
-    numeric_input["Net Price"] = user_input.get("max_net_price", df_model["Net Price"].mean())
-    numeric_input["Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total"] = user_input.get("min_grad_rate", df_model["Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total"].mean())
-    numeric_input["First-Time, Full-Time Retention Rate"] = user_input.get("min_retention", df_model["First-Time, Full-Time Retention Rate"].mean())
-    
-    # 🎯 MISSION-ALIGNED: Add Pell Grant & Affordability Gap to KNN
-    numeric_input["Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years"] = user_input.get("min_grad_rate", df_model["Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years"].mean())
-    numeric_input["Affordability Gap (net price minus income earned working 10 hrs at min wage)"] = user_input.get("max_net_price", df_model["Affordability Gap (net price minus income earned working 10 hrs at min wage)"].mean())
-    
-    numeric_input = numeric_input.fillna(df_model[numeric_features].mean())
-    vec[numeric_features] = scaler.transform(numeric_input.to_frame().T)
+def compute_weighted_scores(df_clean, weights):
+    """🎯 MISSION-ALIGNED: Includes Affordability Gap & Pell-focused graduation rates!"""
+    price, gap = year_prices(weights.get("price_year", "current"), df_clean.index)
+    score = compute_preference_scores(df_clean, weights).to_numpy() + compute_price_scores(price, gap, weights)
+    return pd.Series(score, index=df_clean.index)
+
+# Query encoding in NumPy: column offsets into the encoded matrix, plus the imputed means
+# that stand in for features the student doesn't set
+_encoded_offsets = {col: i for i, col in enumerate(df_encoded.columns)}
+_numeric_offsets = np.array([_encoded_offsets[col] for col in numeric_features])
+_numeric_position = {col: i for i, col in enumerate(numeric_features)}
+_numeric_means = df_model[numeric_features].mean().to_numpy()
+# Squared norms of the encoded colleges, computed once for query_distances
+_fit_norms = np.einsum("ij,ij->i", knn._fit_X, knn._fit_X)[np.newaxis, :]
+
+def encode_query(user_input):
+    """The student's preferences as a row in the encoded feature space."""
+    numeric_input = _numeric_means.copy()
+    # The budget goes in the column of the selected price year
+    price_feature = PRICE_QUERY_FEATURE[PRICE_YEARS[price_year_index(user_input.get("price_year", "current"))]]
+    query_values = [
+        (price_feature, user_input.get("max_net_price")),
+        ("Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total", user_input.get("min_grad_rate")),
+        ("First-Time, Full-Time Retention Rate", user_input.get("min_retention")),
+        # 🎯 MISSION-ALIGNED: Add Pell Grant & Affordability Gap to KNN
+        ("Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years", user_input.get("min_grad_rate")),
+        ("Affordability Gap (net price minus income earned working 10 hrs at min wage)", user_input.get("max_net_price")),
+    ]
+    for feat, value in query_values:
+        if value is not None:
+            numeric_input[_numeric_position[feat]] = value
+
+    vec = np.zeros((1, len(_encoded_offsets)))
+    vec[0, _numeric_offsets] = (numeric_input - scaler.mean_) / scaler.scale_
 
     for feat in binary_features:
         if feat in user_input.get("MSI_preferences", []):
-            vec[feat] = 1
+            vec[0, _encoded_offsets[feat]] = 1
 
     if user_input.get("preferred_state"):
         col = f"State Abbreviation_{user_input['preferred_state']}"
-        if col in vec.columns:
-            vec[col] = 1
+        if col in _encoded_offsets:
+            vec[0, _encoded_offsets[col]] = 1
+    return vec
+
+def query_distances(queries):
+    """euclidean_distances(queries, knn._fit_X), same arithmetic, without per-call validation."""
+    distances = -2 * (queries @ knn._fit_X.T)
+    distances += np.einsum("ij,ij->i", queries, queries)[:, np.newaxis]
+    distances += _fit_norms
+    np.maximum(distances, 0, out=distances)
+    return np.sqrt(distances)
 
-    all_data = knn._fit_X
-    distances = euclidean_distances(vec.values, all_data)
+def knn_similarity(user_input):
+    """🎯 MISSION-ALIGNED: Includes Pell Grant Rate & Affordability Gap in KNN!"""
+    distances = query_distances(encode_query(user_input))
     sim = 1 / (1 + distances.flatten())
     
     return pd.Series(sim, index=index_map)
@@ -172,20 +362,62 @@ def knn_similarity(user_input):
 ALPHA = 0.6
 BETA = 0.4
 
-def recommend_colleges(user_input, top_n=10):
+def standardize(x):
+    """Column-wise StandardScaler().fit_transform(x), same arithmetic, without per-call validation."""
+    n = x.shape[0]
+    mean = x.sum(axis=0) / n
+    temp = x - mean
+    correction = temp.sum(axis=0)
+    var = ((temp ** 2).sum(axis=0) - correction ** 2 / n) / n
+    # Near-constant columns keep a scale of 1, as in StandardScaler
+    eps = np.finfo(x.dtype).eps
+    constant = var <= n * eps * var + (n * mean * eps) ** 2
+    return (x - mean) / np.where(constant, 1.0, np.sqrt(var))
+
+def compute_hybrid_scores(user_input):
+    """Score every college once: (final_score Series, scaled weighted array, scaled KNN array)."""
     weights = convert_preferences_to_weights(user_input)
     weighted_scores = compute_weighted_scores(df_model, weights)
+    check_deadline()
+    # Both score every df_model row in index_map order, so no realignment is needed
     knn_scores = knn_similarity(user_input)
-    knn_scores_aligned = knn_scores.reindex(df_model.index).fillna(0)
+    check_deadline()
 
-    score_scaler = StandardScaler()
-    scaled_weights = score_scaler.fit_transform(weighted_scores.values.reshape(-1, 1)).flatten()
-    scaled_knn = score_scaler.fit_transform(knn_scores_aligned.values.reshape(-1, 1)).flatten()
+    scaled_weights = standardize(weighted_scores.values.reshape(-1, 1)).flatten()
+    scaled_knn = standardize(knn_scores.values.reshape(-1, 1)).flatten()
     
     final_score = pd.Series(
         (ALPHA * scaled_weights + BETA * scaled_knn),
         index=df_model.index
     )
+    return final_score, scaled_weights, scaled_knn
+
+def compute_hybrid_scores_by_year(user_input, years=PRICE_YEARS):
+    """compute_hybrid_scores for several price years in one pass, one column per year."""
+    weights = convert_preferences_to_weights(user_input)
+    cols = [price_year_index(year) for year in years]
+    # Year-independent terms once, then the price terms broadcast over the selected columns
+    preference = compute_preference_scores(df_model, weights).to_numpy()[:, None]
+    weighted_scores = preference + compute_price_scores(price_matrix[:, cols], gap_matrix[:, cols], weights)
+    check_deadline()
+    # One query row per year, all compared with every college in a single distance call
+    queries = np.vstack([encode_query({**user_input, "price_year": year}) for year in years])
+    knn_scores = (1 / (1 + query_distances(queries))).T
+    check_deadline()
+
+    # Each year's column is standardized independently, as the single-year path does
+    scaled_weights = standardize(weighted_scores)
+    scaled_knn = standardize(knn_scores)
+    final_score = pd.DataFrame(ALPHA * scaled_weights + BETA * scaled_knn, index=df_model.index, columns=list(years))
+    return final_score, scaled_weights, scaled_knn
+
+def selected_prices(user_input, idx):
+    """The selected year's net price for the df_model rows `idx`, for display."""
+    price, _ = year_prices(user_input.get("price_year", "current"), idx)
+    return price.round(2)
+
+def recommend_colleges(user_input, top_n=10, scores=None):
+    final_score, scaled_weights, scaled_knn = scores or compute_hybrid_scores(user_input)
     
     top_idx = final_score.nlargest(top_n).index
     results = df.loc[top_idx].copy()
@@ -193,67 +425,312 @@ def recommend_colleges(user_input, top_n=10):
     results['HybridScore'] = final_score[top_idx]
     results['WeightedScore_Scaled'] = scaled_weights[df_model.index.get_indexer(top_idx)]
     results['KnnScore_Scaled'] = scaled_knn[df_model.index.get_indexer(top_idx)]
+    results['SelectedNetPrice'] = selected_prices(user_input, top_idx)
+
+    return results.sort_values("HybridScore", ascending=False)
+
+def compute_facets(user_input, final_score):
+    """Dashboard aggregates over the whole population for one scoring pass."""
+    score = final_score.to_numpy()
+    net_price = price_matrix[:, price_year_index(user_input.get("price_year", "current"))]
+    grad_rate = facet_pell_grad_rate if user_input.get("focus_pell") else facet_grad_rate
+    # Colleges that satisfy the student's slider limits
+    matching = (
+        (net_price <= user_input.get("max_net_price", np.inf))
+        & (grad_rate >= user_input.get("min_grad_rate", 0))
+        & (facet_retention >= user_input.get("min_retention", 0))
+    )
+
+    groups = {}
+    for facet, codes in facet_codes.items():
+        n = len(facet_labels[facet])
+        count = np.bincount(codes, minlength=n)
+        score_sum = np.bincount(codes, weights=score, minlength=n)
+        groups[facet] = {
+            "labels": facet_labels[facet],
+            "count": count.tolist(),
+            "matching": np.bincount(codes, weights=matching, minlength=n).astype(int).tolist(),
+            "meanScore": np.round(score_sum / np.maximum(count, 1), 4).tolist(),
+        }
+
+    edges = np.histogram_bin_edges(score, bins=FACET_SCORE_BINS)
+
+    def quantiles(values):
+        if len(values) == 0:
+            return None
+        return np.round(np.quantile(values, FACET_QUANTILES), 2).tolist()
+
+    return {
+        "total": int(len(score)),
+        "matching": int(matching.sum()),
+        "groups": groups,
+        "scoreHistogram": {
+            "edges": np.round(edges, 4).tolist(),
+            "count": np.histogram(score, bins=edges)[0].tolist(),
+            "matching": np.histogram(score[matching], bins=edges)[0].tolist(),
+        },
+        "quantiles": {
+            "levels": FACET_QUANTILES,
+            "netPrice": quantiles(net_price),
+            "netPriceMatching": quantiles(net_price[matching]),
+            "gradRate": quantiles(grad_rate),
+            "gradRateMatching": quantiles(grad_rate[matching]),
+        },
+    }
+
+def ranked_frames(user_input, final_score, top_n, limit, include_facets=False):
+    """Yield NDJSON frames: top N first, then the rest of the ranking up to `limit`, then a summary."""
+    scores = final_score.to_numpy()
+    top_n = max(1, min(top_n, len(scores)))
+    limit = max(top_n, min(limit, len(scores)))
+
+    def frame(positions, start):
+        results = df.loc[index_map[positions]].copy()
+        results['HybridScore'] = scores[positions]
+        results['SelectedNetPrice'] = selected_prices(user_input, index_map[positions])
+        return {"type": "results", "start": start, "results": to_records(results, ["HybridScore", "SelectedNetPrice"])}
+
+    # Partial selection: only the top N have to be found and sorted before the first flush
+    head = np.argpartition(-scores, top_n - 1)[:top_n]
+    head = head[np.argsort(-scores[head], kind="stable")]
+    yield frame(head, 0)
+
+    if limit > top_n:
+        check_deadline()
+        tail = np.argpartition(-scores, limit - 1)[:limit]
+        tail = tail[~np.isin(tail, head)]
+        tail = tail[np.argsort(-scores[tail], kind="stable")]
+        for start in range(0, len(tail), STREAM_CHUNK_SIZE):
+            check_deadline()
+            yield frame(tail[start:start + STREAM_CHUNK_SIZE], top_n + start)
+
+    summary = {"type": "done", "total": int(len(scores)), "streamed": int(limit), "modelVersion": MODEL_VERSION}
+    if include_facets:
+        check_deadline()
+        summary["facets"] = compute_facets(user_input, final_score)
+    yield summary
+
+def similar_colleges(unit_id, k=DEFAULT_K, user_input=None):
+    """Nearest colleges to `unit_id` from the neighbor table, optionally re-ranked by preferences."""
+    pos = unit_id_to_pos[unit_id]
+    neighbor_pos = similar_neighbors[pos, :k]
+    top_idx = index_map[neighbor_pos]
+    similarity = 1 / (1 + similar_distances[pos, :k].astype(float))
+
+    results = df.loc[top_idx].copy()
+    results['Similarity'] = similarity
+    if user_input is None:
+        return results
 
+    # Re-rank only the K neighbors: O(K) instead of scoring every college
+    weights = convert_preferences_to_weights(user_input)
+    weighted_scores = compute_weighted_scores(df_model.loc[top_idx], weights).values
+    scaled_weights = standardize(weighted_scores.reshape(-1, 1)).flatten()
+    scaled_sim = standardize(similarity.reshape(-1, 1)).flatten()
+    results['HybridScore'] = ALPHA * scaled_weights + BETA * scaled_sim
     return results.sort_values("HybridScore", ascending=False)
 
+def parse_user_input(data):
+    return {
+        "max_net_price": data.get("maxNetPrice", 25000),
+        "min_grad_rate": data.get("minGradRate", 40),
+        "min_retention": data.get("minRetention", 70),
+        "MSI_preferences": data.get("msiPreferences", []),
+        "preferred_state": data.get("preferredState", None),
+        "focus_pell": data.get("focusPell", False),  # 🎯 MISSION-ALIGNED: Pell focus option
+        "price_year": data.get("priceYear", "current")
+    }
+
+@lru_cache(maxsize=4096)
+def cached_search(query, limit):
+    # Keystroke prefixes repeat across users, so most lookups are cache hits
+    return search(search_index, query, limit)
+
+def to_records(results, extra_columns=()):
+    results_subset = results[RESULT_COLUMNS + list(extra_columns)].copy()
+    # Decode categoricals and widen float32 back to the CSV values for JSON
+    for col in results_subset.columns:
+        if isinstance(results_subset[col].dtype, pd.CategoricalDtype):
+            results_subset[col] = results_subset[col].astype(object)
+        elif results_subset[col].dtype == np.float32:
+            results_subset[col] = widen(results_subset[col])
+    # Replace NaN values with 0 to ensure valid JSON
+    results_subset = results_subset.fillna(0)
+    return results_subset.to_dict(orient='records')
+
+def request_data():
+    """Request parameters from the JSON body (POST) or the query string (GET)."""
+    if request.method == 'POST':
+        return request.json
+    args = request.args
+    data = {key: args.get(key, type=float) for key in ("maxNetPrice", "minGradRate", "minRetention") if key in args}
+    for key in ("topN", "streamLimit"):
+        if key in args:
+            data[key] = args.get(key, type=int)
+    if args.get("msiPreferences"):
+        data["msiPreferences"] = args.get("msiPreferences").split(",")
+    for key in ("preferredState", "priceYear"):
+        if args.get(key):
+            data[key] = args.get(key)
+    for flag in ("focusPell", "includeFacets"):
+        if flag in args:
+            data[flag] = args.get(flag).lower() in ("1", "true", "yes")
+    return data
+
+def result_etag(user_input, **options):
+    """ETag for a deterministic result: model version plus the canonical input."""
+    canonical = {
+        key: float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+        for key, value in {**user_input, **options}.items()
+    }
+    canonical["MSI_preferences"] = sorted(canonical["MSI_preferences"])
+    return etag_for((MODEL_VERSION + json.dumps(canonical, sort_keys=True)).encode())
+
 # Serve static files
 @app.route('/')
 def serve_index():
-    return send_from_directory('.', 'index.html')
+    return static_response('.', 'index.html')
 
 @app.route('/about.html')
 def serve_about():
-    return send_from_directory('.', 'about.html')
+    return static_response('.', 'about.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
     # Serve CSS, JS, and other static files
     if path.endswith(('.css', '.js', '.html')):
-        return send_from_directory('.', path)
+        return static_response('.', path)
     # If not a static file, return 404
     return "Not found", 404
 
 # API Endpoints
-@app.route('/api/recommend', methods=['POST'])
+@app.route('/api/recommend', methods=['GET', 'POST'])
 def get_recommendations():
     try:
-        data = request.json
-        user_input = {
-            "max_net_price": data.get("maxNetPrice", 25000),
-            "min_grad_rate": data.get("minGradRate", 40),
-            "min_retention": data.get("minRetention", 70),
-            "MSI_preferences": data.get("msiPreferences", []),
-            "preferred_state": data.get("preferredState", None),
-            "focus_pell": data.get("focusPell", False)  # 🎯 MISSION-ALIGNED: Pell focus option
-        }
+        data = request_data()
+        user_input = parse_user_input(data)
         
         top_n = data.get("topN", 10)
-        results = recommend_colleges(user_input, top_n)
-        
-        # 🎯 MISSION-ALIGNED: Include Pell & Affordability data in response
-        results_subset = results[[
-            "Institution Name",
-            "State Abbreviation",
-            "Net Price",
-            "MSI Status",
-            "First-Time, Full-Time Retention Rate",
-            "Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total",
-            "Region",
-            "HybridScore",
-            "City",
-            "Affordability Gap (net price minus income earned working 10 hrs at min wage)",
-            "Percent of First-Time, Full-Time Undergraduates Awarded Pell Grants",
-            "Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years"
-        ]].copy()
-        
-        # Replace NaN values with None (becomes null in JSON) to ensure valid JSON
-        results_subset = results_subset.fillna(0)  # Replace NaN with 0 for numeric fields
-        
-        results_dict = results_subset.to_dict(orient='records')
-        
+        # Deterministic for a given input and model version: skip the work on a cache hit
+        etag = result_etag(user_input, top_n=top_n, include_facets=bool(data.get("includeFacets", False)))
+        if not_modified(etag):
+            return json_response(b"", etag, METADATA_MAX_AGE)
+
+        if user_input["price_year"] == "all":
+            # Batch mode: one ranking per price year from a single scoring pass
+            with admitted():
+                final_score, scaled_weights, scaled_knn = run_scoring(compute_hybrid_scores_by_year, user_input)
+                results_by_year = {}
+                for j, year in enumerate(PRICE_YEARS):
+                    year_scores = (final_score[year], scaled_weights[:, j], scaled_knn[:, j])
+                    results = recommend_colleges({**user_input, "price_year": year}, top_n, year_scores)
+                    results_by_year[year] = to_records(results, ["HybridScore", "SelectedNetPrice"])
+            response = {"success": True, "priceYears": PRICE_YEARS, "resultsByYear": results_by_year}
+            return json_response(app.json.dumps(response).encode(), etag, METADATA_MAX_AGE)
+
+        with admitted():
+            scores = run_scoring(compute_hybrid_scores, user_input)
+            results = recommend_colleges(user_input, top_n, scores)
+            check_deadline()
+            
+            # 🎯 MISSION-ALIGNED: Include Pell & Affordability data in response
+            results_dict = to_records(results, ["HybridScore", "SelectedNetPrice"])
+            
+            response = {
+                "success": True,
+                "results": results_dict
+            }
+            # Dashboard aggregates from the same scoring pass
+            if data.get("includeFacets", False):
+                check_deadline()
+                response["facets"] = compute_facets(user_input, scores[0])
+        return json_response(app.json.dumps(response).encode(), etag, METADATA_MAX_AGE)
+    except (Overloaded, DeadlineExceeded):
+        raise
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/api/recommend/stream', methods=['GET', 'POST'])
+def stream_recommendations():
+    """Newline-delimited JSON version of /api/recommend: first cards immediately, the long tail after."""
+    try:
+        data = request_data()
+        user_input = parse_user_input(data)
+        # Validated before the 200 is committed: errors inside the generator would truncate the stream
+        try:
+            top_n = int(data.get("topN", 10))
+            limit = int(data.get("streamLimit", STREAM_DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            raise ValueError("topN and streamLimit must be integers")
+        top_n, limit = min(top_n, STREAM_MAX_LIMIT), min(limit, STREAM_MAX_LIMIT)
+        include_facets = bool(data.get("includeFacets", False))
+
+        with admitted():
+            final_score, _, _ = run_scoring(compute_hybrid_scores, user_input)
+    except (Overloaded, DeadlineExceeded):
+        raise
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+    def generate():
+        # Serialize and flush one frame at a time; the full response is never held in memory
+        try:
+            for frame in ranked_frames(user_input, final_score, top_n, limit, include_facets):
+                yield app.json.dumps(frame) + "\n"
+        except DeadlineExceeded:
+            yield app.json.dumps({"type": "error", "error": "Request deadline exceeded."}) + "\n"
+
+    response = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+    # A stream can still end in an error frame after the 200, so it must never be cached
+    response.cache_control.no_store = True
+    response.headers["X-Accel-Buffering"] = "no"  # ask proxies not to buffer the stream
+    return response
+
+@app.route('/api/facets', methods=['POST'])
+def get_facets():
+    try:
+        user_input = parse_user_input(request.json)
+        with admitted():
+            final_score, _, _ = run_scoring(compute_hybrid_scores, user_input)
+            facets = compute_facets(user_input, final_score)
+        return jsonify({
+            "success": True,
+            "facets": facets
+        })
+    except (Overloaded, DeadlineExceeded):
+        raise
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 400
+
+@app.route('/api/similar/<int:unit_id>', methods=['GET', 'POST'])
+def get_similar(unit_id):
+    if unit_id not in unit_id_to_pos:
+        return jsonify({
+            "success": False,
+            "error": f"Unknown Unit ID: {unit_id}"
+        }), 404
+    try:
+        k = max(1, min(int(request.args.get("k", DEFAULT_K)), similar_neighbors.shape[1]))
+        # A JSON body of student preferences re-ranks the neighbors
+        data = request.get_json(silent=True)
+        user_input = parse_user_input(data) if data else None
+        results = similar_colleges(unit_id, k, user_input)
+
+        extra_columns = ["Similarity"] + (["HybridScore"] if user_input else [])
         return jsonify({
             "success": True,
-            "results": results_dict
+            "unitId": unit_id,
+            "institution": df.loc[index_map[unit_id_to_pos[unit_id]], "Institution Name"],
+            "results": to_records(results, extra_columns)
         })
     except Exception as e:
         return jsonify({
@@ -261,14 +738,49 @@ def get_recommendations():
             "error": str(e)
         }), 400
 
+@app.route('/api/search', methods=['GET'])
+def search_institutions():
+    query = request.args.get("q", "").strip()
+    limit = max(1, min(request.args.get("limit", 10, type=int), SEARCH_MAX_LIMIT))
+    return jsonify({
+        "success": True,
+        "query": query,
+        "results": cached_search(query.lower(), limit)
+    })
+
 @app.route('/api/states', methods=['GET'])
 def get_states():
-    states = sorted(df['State Abbreviation'].dropna().unique().tolist())
-    return jsonify(states)
+    return json_response(states_body, etag_for(states_body), METADATA_MAX_AGE)
+
+@app.route('/api/meta', methods=['GET'])
+def get_meta():
+    # Slider bounds come from the feature ranges in the data
+    return json_response(meta_body, etag_for(meta_body), METADATA_MAX_AGE)
+
+@app.errorhandler(Overloaded)
+def handle_overloaded(e):
+    # Shed load fast so clients retry instead of queueing behind work they will time out on
+    response = jsonify({
+        "success": False,
+        "error": "Server is busy, please retry shortly."
+    })
+    response.status_code = 503
+    response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response
+
+@app.errorhandler(DeadlineExceeded)
+def handle_deadline_exceeded(e):
+    response = jsonify({
+        "success": False,
+        "error": "Request deadline exceeded."
+    })
+    response.status_code = 503
+    response.headers["Retry-After"] = str(RETRY_AFTER_SECONDS)
+    return response
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy"})
+    return jsonify({"status": "healthy", "admission": admission_stats()})
 
 if __name__ == '__main__':
     # Use PORT from environment variable (for deployment) or default to 5000 (for local dev)
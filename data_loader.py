@@ -0,0 +1,118 @@
+"""
+Schema-declared loading of merged_dataset.csv.
+
+Repetitive text columns are dictionary-encoded as pandas categoricals,
+two-decimal numerics are downcast to float32, and callers can load only
+the columns they use. Run the module to print a memory report against a
+default `pd.read_csv`:
+
+    python data_loader.py
+"""
+import numpy as np
+import pandas as pd
+
+DATASET_PATH = "processed_data/merged_dataset.csv"
+
+# Low-cardinality text columns: stored once per distinct value
+CATEGORY_COLUMNS = [
+    "State Abbreviation",
+    "Region",
+    "Sector Name",
+    "MSI Type",
+    "City",
+    "City of Institution",
+    "County Name",
+    "Institution Size Category Name",
+    "Highest Degree Offered Name",
+    "Highest Level Offered Name",
+    "Institution Type",
+]
+
+# Free text that stays as plain strings
+TEXT_COLUMNS = [
+    "Institution Name",
+    "Zip Code",
+    "Cost of Attendance: In State, On Campus",
+]
+
+INTEGER_COLUMNS = {
+    "Unit ID": np.int32,
+    "UNIQUE_IDENTIFICATION_NUMBER_OF_THE_INSTITUTION": np.int32,
+}
+
+# Numerics with more than two decimals (computed prices, gaps, hours) keep float64 precision
+FLOAT64_COLUMNS = [
+    "Net Price",
+    "Affordability Gap (net price minus income earned working 10 hrs at min wage)",
+    "Weekly Hours to Close Gap",
+    "State Minimum Wage",
+    "Monthly Center-Based Child Care Cost",
+    "Annual Center-Based Child Care Cost",
+    "Adjusted Monthly Center-Based Child Care Cost",
+    "Monthly Home-Based Child Care Cost",
+    "Adjusted Monthly Home-Based Child Care Cost",
+    "Annual Home-Based Child Care Cost",
+]
+
+# Every other column is numeric with at most two decimals and loads as float32
+# (0/1 MSI flags included, since they have NaNs)
+NUMERIC_DTYPE = np.float32
+
+
+def dataset_schema(columns):
+    """dtype mapping for read_csv, limited to `columns`."""
+    schema = {}
+    for col in columns:
+        if col in CATEGORY_COLUMNS:
+            schema[col] = "category"
+        elif col in TEXT_COLUMNS:
+            schema[col] = object
+        elif col in INTEGER_COLUMNS:
+            schema[col] = INTEGER_COLUMNS[col]
+        elif col in FLOAT64_COLUMNS:
+            schema[col] = np.float64
+        else:
+            schema[col] = NUMERIC_DTYPE
+    return schema
+
+
+def load_dataset(path=DATASET_PATH, columns=None):
+    """Load the dataset with the declared schema, optionally only `columns`."""
+    if columns is None:
+        columns = pd.read_csv(path, nrows=0).columns.tolist()
+    columns = list(dict.fromkeys(columns))
+    return pd.read_csv(path, usecols=columns, dtype=dataset_schema(columns))[columns]
+
+
+def widen(series):
+    """float64 copy of a float32 column; rounding to two decimals recovers the CSV values exactly."""
+    return series.astype(np.float64).round(2)
+
+
+def memory_mb(frame):
+    return frame.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def memory_report(before, after):
+    """Text report comparing resident size of two loads of the dataset."""
+    lines = [
+        f"Default load:   {before.shape[0]} rows x {before.shape[1]} cols, {memory_mb(before):.2f} MB",
+        f"Schema load:    {after.shape[0]} rows x {after.shape[1]} cols, {memory_mb(after):.2f} MB",
+        f"Reduction:      {1 - memory_mb(after) / memory_mb(before):.0%}",
+        "",
+        f"{'Column':<45} {'dtype':<10} {'before KB':>10} {'after KB':>10}",
+    ]
+    before_usage = before.memory_usage(deep=True, index=False)
+    after_usage = after.memory_usage(deep=True, index=False)
+    for col in after_usage.sort_values(ascending=False).index[:15]:
+        lines.append(
+            f"{col[:45]:<45} {str(after[col].dtype):<10} "
+            f"{before_usage[col] / 1024:>10.1f} {after_usage[col] / 1024:>10.1f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    from api import SERVING_COLUMNS
+
+    print(memory_report(pd.read_csv(DATASET_PATH), load_dataset(DATASET_PATH, SERVING_COLUMNS)))
@@ -0,0 +1,41 @@
+"""
+Gunicorn settings for the threaded serving mode:
+
+    gunicorn -c gunicorn.conf.py api:app
+
+One gthread worker process per available CPU. The model is loaded once in the
+master (preload_app) and shared copy-on-write with the forked workers. In each
+worker, request threads answer health checks, static files and metadata
+inline, while scoring runs on the worker's bounded pool (see admission.py).
+
+Scoring is mostly Python/pandas code that holds the GIL, so a process scores on
+about one core. Cores are filled with processes, one scoring thread each.
+
+Environment:
+    PORT               port to bind (default: 8000)
+    WEB_CONCURRENCY    worker processes (default: CPUs available to the container)
+    MAX_IN_FLIGHT      scoring threads per worker (default here: 1)
+    GUNICORN_THREADS   request threads per worker (default: enough for every
+                       scoring slot and queue place, plus room for light routes)
+"""
+import os
+import sys
+
+# One scoring thread per process, and each NumPy/BLAS call single-threaded,
+# so N workers use N cores without oversubscribing them
+os.environ.setdefault("MAX_IN_FLIGHT", "1")
+for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+    os.environ.setdefault(var, "1")
+
+# Same limits as the app (CPU count from affinity / cgroup quota, not host cores)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from admission import MAX_IN_FLIGHT, MAX_QUEUE, available_cpus  # noqa: E402
+
+LIGHT_ROUTE_THREADS = 8
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", available_cpus()))
+threads = int(os.environ.get("GUNICORN_THREADS", MAX_IN_FLIGHT + MAX_QUEUE + LIGHT_ROUTE_THREADS))
+preload_app = True
+timeout = 120
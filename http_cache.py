@@ -0,0 +1,165 @@
+"""
+HTTP caching helpers: content-hashed ETags, Cache-Control and compression.
+
+- Static assets are served from memory with a content-hash ETag. HTML pages
+  reference style.css/script.js with a `?v=<hash>` query so those URLs can be
+  cached for a year; the HTML itself is always revalidated.
+- Deterministic JSON (metadata, recommendation results) gets an ETag so
+  repeat requests are answered with 304 Not Modified.
+- Large text responses are compressed with brotli (if installed) or gzip,
+  and the compressed bytes are kept in a small LRU keyed by ETag.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+STATIC_MAX_AGE = 60 * 60 * 24 * 365  # versioned URLs never change content
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_MIMETYPES = ("text/html", "text/css", "application/javascript", "text/javascript", "application/json")
+COMPRESSED_CACHE_SIZE = 256
+
+_ASSET_REF = re.compile(r'(href|src)="([^"/:?#]+\.(?:css|js))"')
+
+_assets = {}
+_compressed = OrderedDict()
+_lock = threading.Lock()
+
+
+def etag_for(data):
+    """Content hash used as a strong ETag."""
+    return hashlib.sha256(data).hexdigest()[:20]
+
+
+def _load_asset(root, path):
+    """Read a file from disk, cached in memory until its mtime changes."""
+    full_path = safe_join(root, path)
+    if full_path is None or not os.path.isfile(full_path):
+        raise NotFound()
+    mtime = os.stat(full_path).st_mtime_ns
+    asset = _assets.get(full_path)
+    if asset is None or asset["mtime"] != mtime:
+        with open(full_path, "rb") as f:
+            body = f.read()
+        mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if path.endswith(".js"):
+            mimetype = "application/javascript"
+        asset = {"mtime": mtime, "body": body, "etag": etag_for(body), "mimetype": mimetype}
+        _assets[full_path] = asset
+    return asset
+
+
+def _versioned_html(root, asset):
+    """Point local css/js references at `?v=<content hash>` URLs."""
+    def add_version(match):
+        try:
+            ref = _load_asset(root, match.group(2))
+        except NotFound:
+            return match.group(0)
+        return f'{match.group(1)}="{match.group(2)}?v={ref["etag"][:12]}"'
+
+    html = _ASSET_REF.sub(add_version, asset["body"].decode("utf-8"))
+    return html.encode("utf-8")
+
+
+def static_response(root, path):
+    """Serve a static file with a content-hash ETag and matching Cache-Control."""
+    asset = _load_asset(root, path)
+    body = asset["body"]
+    if path.endswith(".html"):
+        body = _versioned_html(root, asset)
+
+    response = Response(body, mimetype=asset["mimetype"])
+    response.set_etag(etag_for(body))
+    if path.endswith(".html"):
+        # HTML URLs are not versioned: cache but always revalidate
+        response.cache_control.no_cache = True
+    elif request.args.get("v") == asset["etag"][:12]:
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def json_response(body, etag, max_age=0):
+    """Serve pre-serialized JSON bytes, answering 304 when the client has `etag`."""
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def not_modified(etag):
+    """True if a GET's If-None-Match already holds `etag`, so the work can be skipped."""
+    return request.method in ("GET", "HEAD") and request.if_none_match.contains_weak(etag)
+
+
+def _encode(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def compress_response(response):
+    """after_request hook: brotli/gzip large text responses."""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    # Shared caches must key every compressible response on the encoding, even uncompressed ones
+    response.vary.add("Accept-Encoding")
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        encoding = "br"
+    elif accepted["gzip"]:
+        encoding = "gzip"
+    else:
+        return response
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    etag, _ = response.get_etag()
+    key = (etag, encoding)
+    with _lock:
+        compressed = _compressed.get(key) if etag else None
+        if compressed is not None:
+            _compressed.move_to_end(key)
+    if compressed is None:
+        compressed = _encode(data, encoding)
+        if etag:
+            with _lock:
+                _compressed[key] = compressed
+                if len(_compressed) > COMPRESSED_CACHE_SIZE:
+                    _compressed.popitem(last=False)
+
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        # Same content, different bytes: the ETag can only vouch for it weakly
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,271 @@
+"""
+Local load test: run the app under several gunicorn configurations and replay
+the frontend's traffic pattern at increasing concurrency.
+
+Each simulated user loads the page (index.html, style.css, script.js,
+/api/states) and then runs searches the way script.js does: one cacheable
+GET /api/recommend with includeFacets=true per search. `--stream` sends the
+same search to the NDJSON /api/recommend/stream endpoint, and `--legacy`
+replays the older pattern (a top-N POST plus a top-200 POST per search).
+
+    python loadtest.py
+    python loadtest.py --configs sync:1 sync:4 gthread:2x8 --concurrency 1 8 32 --duration 15
+
+Configs are `<worker class>:<workers>[x<threads>]`, or `gunicorn.conf.py` for
+the threaded serving mode. Output is a comparison table of throughput, latency
+percentiles (with page-load requests broken out), error rate (with
+load-shedding 503s broken out) and per-worker memory.
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode
+
+import numpy as np
+
+SERVING_CONFIG = "gunicorn.conf.py"
+DEFAULT_CONFIGS = ["sync:1", f"sync:{os.cpu_count() or 2}", "gthread:2x4", SERVING_CONFIG]
+DEFAULT_CONCURRENCY = [1, 4, 16, 32]
+SEARCHES_PER_VISIT = 3
+MSI_TYPES = ["HSI", "PBI", "HBCU", "AANAPII", "ANNHI", "TRIBAL", "NANTI"]
+STATES = ["CA", "TX", "NY", "FL", "IL", "PA", "OH", "GA", "NC", "MI", "MA", "WA"]
+
+
+def random_profile(rng):
+    """A preference profile drawn from the ranges of the frontend sliders."""
+    return {
+        "maxNetPrice": rng.randrange(5000, 50001, 1000),
+        "minGradRate": min(100, max(0, int(rng.gauss(40, 15)) // 5 * 5)),
+        "minRetention": min(100, max(0, int(rng.gauss(70, 10)) // 5 * 5)),
+        "topN": rng.randint(5, 20),
+        "msiPreferences": [m for m in MSI_TYPES if rng.random() < 0.1],
+        "preferredState": rng.choice(STATES) if rng.random() < 0.5 else None,
+        "focusPell": rng.random() < 0.3,
+    }
+
+
+def page_load_requests():
+    return [
+        ("static", "GET", "/", None),
+        ("static", "GET", "/style.css", None),
+        ("static", "GET", "/script.js", None),
+        ("states", "GET", "/api/states", None),
+    ]
+
+
+def search_requests(profile, mode="get"):
+    if mode == "legacy":
+        return [
+            ("recommend", "POST", "/api/recommend", profile),
+            ("recommend", "POST", "/api/recommend", {**profile, "topN": 200}),
+        ]
+    params = {**profile, "includeFacets": True}
+    path = "/api/recommend"
+    if mode == "stream":
+        params["streamLimit"] = profile["topN"]
+        path = "/api/recommend/stream"
+    query = {
+        key: ",".join(value) if isinstance(value, list) else str(value).lower() if isinstance(value, bool) else value
+        for key, value in params.items() if value is not None
+    }
+    return [("recommend", "GET", path + "?" + urlencode(query), None)]
+
+
+def visit(rng, mode="get"):
+    """One simulated user session: a page load followed by a few searches."""
+    requests = page_load_requests()
+    for _ in range(SEARCHES_PER_VISIT):
+        requests += search_requests(random_profile(rng), mode)
+    return requests
+
+
+def send(base_url, method, path, body, timeout=30):
+    data = None
+    # Same deadline header as the frontend's fetchWithTimeout
+    headers = {"Accept-Encoding": "gzip", "X-Request-Timeout-Ms": str(int(timeout * 1000))}
+    # Stamped like a platform router, so time in gunicorn's backlog counts against the deadline
+    headers["X-Request-Start"] = f"t={int(time.time() * 1000)}"
+    if body is not None:
+        data = json.dumps(body).encode()
+        headers["Content-Type"] = "application/json"
+    req = urllib.request.Request(base_url + path, data=data, method=method, headers=headers)
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run_level(base_url, concurrency, duration, mode, seed):
+    """Closed-loop load: `concurrency` users replay visits back to back for `duration` seconds."""
+    samples = []  # (kind, latency seconds, ok, shed)
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def user(user_id):
+        rng = random.Random(seed * 1000 + user_id)
+        local = []
+        while time.perf_counter() < stop_at:
+            for kind, method, path, body in visit(rng, mode):
+                if time.perf_counter() >= stop_at:
+                    break
+                start = time.perf_counter()
+                try:
+                    status = send(base_url, method, path, body)
+                except Exception:
+                    status = None
+                local.append((kind, time.perf_counter() - start, status is not None and status < 400, status == 503))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - started
+
+
+def worker_rss_mb(master_pid):
+    """Resident memory of each gunicorn worker (Linux /proc only)."""
+    rss = []
+    try:
+        pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except FileNotFoundError:
+        return rss
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                status = dict(line.split(":", 1) for line in f if ":" in line)
+        except OSError:
+            continue
+        if int(status.get("PPid", "0").strip()) == master_pid and "VmRSS" in status:
+            rss.append(int(status["VmRSS"].split()[0]) / 1024)
+    return rss
+
+
+def parse_config(spec):
+    worker_class, _, size = spec.partition(":")
+    workers, _, threads = (size or "1").partition("x")
+    return worker_class, int(workers), int(threads or 1)
+
+
+def start_server(spec, port):
+    cmd = [sys.executable, "-m", "gunicorn", "api:app", "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+    if spec == SERVING_CONFIG:
+        cmd += ["--config", SERVING_CONFIG]
+    else:
+        worker_class, workers, threads = parse_config(spec)
+        cmd += [
+            "--worker-class", worker_class,
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--timeout", "120",
+        ]
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)))
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode} for config {spec}")
+        try:
+            # Every worker loads the model on boot; wait until one answers
+            if send(base_url, "GET", "/api/health", None, timeout=2) == 200:
+                return proc, base_url
+        except OSError:
+            pass
+        time.sleep(0.5)
+    stop_server(proc)
+    raise RuntimeError(f"gunicorn did not become healthy for config {spec}")
+
+
+def stop_server(proc):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def summarize(spec, concurrency, samples, elapsed, rss):
+    latencies = np.array([s[1] for s in samples]) * 1000 if samples else np.zeros(1)
+    recommend = np.array([s[1] for s in samples if s[0] == "recommend"]) * 1000
+    page = np.array([s[1] for s in samples if s[0] != "recommend"]) * 1000
+    errors = sum(not s[2] for s in samples)
+    return {
+        "config": spec,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "rps": len(samples) / elapsed,
+        "p50": np.percentile(latencies, 50),
+        "p95": np.percentile(latencies, 95),
+        "p99": np.percentile(latencies, 99),
+        "rec_p95": np.percentile(recommend, 95) if len(recommend) else float("nan"),
+        "page_p95": np.percentile(page, 95) if len(page) else float("nan"),
+        "error_rate": errors / max(len(samples), 1),
+        "shed_rate": sum(s[3] for s in samples) / max(len(samples), 1),
+        "rss_mb": max(rss) if rss else float("nan"),
+        "workers_seen": len(rss),
+    }
+
+
+def print_table(rows):
+    header = (f"{'config':<16} {'conc':>5} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'rec p95':>8} {'page p95':>8} {'err %':>6} {'503 %':>6} {'RSS/worker MB':>14}")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['config']:<16} {r['concurrency']:>5} {r['requests']:>7} {r['rps']:>8.1f} {r['p50']:>8.1f} "
+              f"{r['p95']:>8.1f} {r['p99']:>8.1f} {r['rec_p95']:>8.1f} {r['page_p95']:>8.1f} {r['error_rate'] * 100:>6.1f} "
+              f"{r['shed_rate'] * 100:>6.1f} "
+              f"{r['rss_mb']:>9.1f} (x{r['workers_seen']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay frontend traffic against local gunicorn configurations.")
+    parser.add_argument("--configs", nargs="+", default=DEFAULT_CONFIGS,
+                        help=f"gunicorn configs as <worker class>:<workers>[x<threads>], or {SERVING_CONFIG}")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=DEFAULT_CONCURRENCY,
+                        help="concurrent simulated users per level")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--legacy", action="store_true",
+                        help="replay the old top-N + top-200 POST pair per search")
+    parser.add_argument("--stream", action="store_true",
+                        help="send searches to the NDJSON /api/recommend/stream endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+    mode = "legacy" if args.legacy else "stream" if args.stream else "get"
+
+    rows = []
+    for i, spec in enumerate(args.configs):
+        print(f"Starting gunicorn ({spec})...", flush=True)
+        proc, base_url = start_server(spec, args.port + i)
+        try:
+            run_level(base_url, 2, 2.0, mode, args.seed)  # warm-up
+            for concurrency in args.concurrency:
+                samples, elapsed = run_level(base_url, concurrency, args.duration, mode, args.seed)
+                row = summarize(spec, concurrency, samples, elapsed, worker_rss_mb(proc.pid))
+                rows.append(row)
+                print(f"  {concurrency:>4} users: {row['rps']:.1f} req/s, p95 {row['p95']:.1f} ms, "
+                      f"errors {row['error_rate']:.1%}", flush=True)
+        finally:
+            stop_server(proc)
+
+    print()
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
@@ -113,42 +113,41 @@ document.getElementById('recommendForm').onsubmit = async function(e) {
     showTableauLoading();
     
     try {
-        // Fetch both API calls in parallel for faster loading
+        // One request returns the top N cards plus dashboard aggregates
         console.log('🚀 Fetching recommendations...');
         
-        const dataFor200 = {...data, topN: 200};
+        // Dashboard aggregates come back with the same request
+        const dataWithFacets = {...data, includeFacets: true};
         
         // Add timeout wrapper for fetch
         const fetchWithTimeout = (url, options, timeout = 30000) => {
+            // Tell the server our deadline so it stops work we will no longer wait for
+            const headers = {...(options.headers || {}), 'X-Request-Timeout-Ms': String(timeout)};
             return Promise.race([
-                fetch(url, options),
+                fetch(url, {...options, headers}),
                 new Promise((_, reject) =>
                     setTimeout(() => reject(new Error('Request timeout')), timeout)
                 )
             ]);
         };
         
-        const [response, response200] = await Promise.all([
-            fetchWithTimeout('/api/recommend', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify(data)
-            }, 30000),
-            fetchWithTimeout('/api/recommend', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify(dataFor200)
-            }, 30000)
-        ]);
+        // GET with a canonical query string so the browser/CDN cache can answer repeat searches
+        const params = new URLSearchParams();
+        Object.entries(dataWithFacets).forEach(([key, value]) => {
+            if (value === null || value === undefined) return;
+            params.set(key, Array.isArray(value) ? value.join(',') : String(value));
+        });
+        
+        const response = await fetchWithTimeout(`/api/recommend?${params}`, {}, 30000);
 
-        if (!response.ok || !response200.ok) {
-            throw new Error(`Server returned error: ${response.status} / ${response200.status}`);
+        if (response.status === 503) {
+            throw new Error('Server busy');
+        }
+        if (!response.ok) {
+            throw new Error(`Server returned error: ${response.status}`);
         }
 
-        const [result, result200] = await Promise.all([
-            response.json(),
-            response200.json()
-        ]);
+        const result = await response.json();
         
         if (result.success) {
             // Display the top N in cards with staggered animation
@@ -156,9 +155,9 @@ document.getElementById('recommendForm').onsubmit = async function(e) {
             loading.classList.remove('active');
             
             // Update Tableau dashboards immediately using iframe URL filtering
-            if (result200.success) {
+            if (result.facets) {
                 console.log('✅ Updating Tableau dashboards now...');
-                updateTableauDashboards(result.results, result200.results);
+                updateTableauDashboards(result.results, result.facets);
                 hideTableauLoading();
                 
                 // Scroll to Tableau dashboard
@@ -186,6 +185,8 @@ document.getElementById('recommendForm').onsubmit = async function(e) {
         let errorMessage = 'Error connecting to server.';
         if (error.message === 'Request timeout') {
             errorMessage = 'Request timed out. The server is taking too long to respond. Try reducing the number of results or simplifying your search.';
+        } else if (error.message === 'Server busy') {
+            errorMessage = 'The server is busy right now. Please try again in a moment.';
         } else if (error.message.includes('Failed to fetch')) {
             errorMessage = 'Cannot reach the server. Make sure Flask is running on port 5000. Check the terminal for errors.';
         } else {
@@ -351,7 +352,7 @@ function hideTableauLoading() {
 /**
  * Update Tableau dashboards using iframe URL filtering
  */
-function updateTableauDashboards(topColleges, allColleges) {
+function updateTableauDashboards(topColleges, facets) {
     if (!topColleges) {
         console.log('⚠️ No colleges to display');
         return;
@@ -359,7 +360,7 @@ function updateTableauDashboards(topColleges, allColleges) {
     
     console.log('🔄 Refreshing Tableau dashboards...');
     console.log(`  → Your results: ${topColleges.length} colleges`);
-    console.log(`  → Extended data: ${allColleges.length} colleges`);
+    console.log(`  → Population: ${facets.total} colleges, ${facets.matching} within your limits`);
     
     const dashboard1BaseUrl = `${baseDashboard1Url}?:language=en-US&:embed=y&:display_count=n&:showVizHome=no&:refresh=yes`;
     const dashboard2BaseUrl = `${baseDashboard2Url}?:language=en-US&:embed=y&:display_count=n&:showVizHome=no&:refresh=yes`;
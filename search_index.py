@@ -0,0 +1,149 @@
+"""
+Institution name search / autocomplete.
+
+The index is built once at startup: a prefix trie over the words of each
+`Institution Name` and `City` answers as-you-type queries, and a trigram
+index over the same words catches typos when nothing matches as typed.
+"""
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_DOCS = ""  # trie node key holding the doc ids under that prefix
+_MAX_RANKED = 256  # candidates fully ranked per query; broader prefixes keep the best by static rank
+
+
+def normalize(text):
+    """Lowercase, strip accents and punctuation: 'Université  St-Louis' -> 'universite st louis'."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode()
+    return _NON_ALNUM.sub(" ", text.lower().replace("&", " and ")).strip()
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_search_index(unit_ids, names, cities, states):
+    """Build the trie and trigram index over names and cities."""
+    docs = []
+    trie = {}
+    postings = {}
+    for unit_id, name, city, state in zip(unit_ids, names, cities, states):
+        doc_id = len(docs)
+        name = "" if name != name else str(name)  # NaN-safe
+        city = "" if city != city else str(city)
+        state = "" if state != state else str(state)
+        name_norm = normalize(name)
+        docs.append({
+            "record": {
+                "Unit ID": int(unit_id),
+                "Institution Name": name,
+                "City": city,
+                "State Abbreviation": state,
+            },
+            "name_norm": name_norm,
+            "name_tokens": set(name_norm.split()),
+        })
+
+        tokens = set(name_norm.split()) | set(normalize(city).split())
+        for token in tokens:
+            node = trie
+            for ch in token:
+                node = node.setdefault(ch, {})
+                node.setdefault(_DOCS, set()).add(doc_id)
+            for gram in trigrams(token):
+                postings.setdefault(gram, set()).add(doc_id)
+
+    # Shorter names first, so broad prefixes surface the most direct matches
+    static_rank = sorted(range(len(docs)), key=lambda d: (len(docs[d]["name_norm"]), docs[d]["name_norm"]))
+    rank_of = np.empty(len(docs), dtype=np.int32)
+    rank_of[static_rank] = np.arange(len(docs), dtype=np.int32)
+
+    def freeze(node):
+        for key, child in node.items():
+            if key == _DOCS:
+                node[_DOCS] = frozenset(child)
+            else:
+                freeze(child)
+    freeze(trie)
+
+    # Sorted full names: a bisect finds every name starting with the query
+    by_name = sorted(range(len(docs)), key=lambda d: docs[d]["name_norm"])
+
+    return {
+        "docs": docs,
+        "trie": trie,
+        "trigrams": {gram: np.fromiter(ids, dtype=np.int32) for gram, ids in postings.items()},
+        "rank_of": rank_of,
+        "sorted_names": [docs[d]["name_norm"] for d in by_name],
+        "sorted_name_docs": by_name,
+    }
+
+
+def _prefix_docs(index, token):
+    node = index["trie"]
+    for ch in token:
+        node = node.get(ch)
+        if node is None:
+            return None
+    return node[_DOCS]
+
+
+def _fuzzy_docs(index, tokens, limit, min_score=0.5):
+    """Rank documents by the share of query trigrams they contain."""
+    query_grams = set()
+    for token in tokens:
+        query_grams |= trigrams(token)
+    hits = [index["trigrams"][g] for g in query_grams if g in index["trigrams"]]
+    if not hits:
+        return []
+    scores = np.bincount(np.concatenate(hits), minlength=len(index["docs"])) / len(query_grams)
+    candidates = np.flatnonzero(scores >= min_score)
+    # Best overlap first, shorter names breaking ties
+    order = np.lexsort((index["rank_of"][candidates], -scores[candidates]))[:limit]
+    return candidates[order].tolist()
+
+
+def search(index, query, limit=10):
+    """Return up to `limit` records matching `query`, best match first."""
+    query_norm = normalize(query)
+    tokens = query_norm.split()
+    if not tokens:
+        return []
+
+    matches = []
+    # Names that start with the whole query rank first
+    lo = bisect.bisect_left(index["sorted_names"], query_norm)
+    hi = bisect.bisect_left(index["sorted_names"], query_norm + "\x7f")
+    if lo < hi:
+        leading = index["sorted_name_docs"][lo:hi]
+        matches = sorted(leading, key=lambda d: index["rank_of"][d])[:limit]
+
+    doc_sets = [_prefix_docs(index, t) for t in tokens]
+    if len(matches) < limit and all(s is not None for s in doc_sets):
+        # Intersect starting from the rarest prefix
+        doc_sets.sort(key=len)
+        candidates = np.fromiter(
+            set(doc_sets[0]).intersection(*doc_sets[1:]).difference(matches), dtype=np.int32
+        )
+        if len(candidates) > _MAX_RANKED:
+            keep = np.argpartition(index["rank_of"][candidates], _MAX_RANKED)[:_MAX_RANKED]
+            candidates = candidates[keep]
+
+        docs = index["docs"]
+        rank_of = index["rank_of"]
+
+        def sort_key(d):
+            # Prefer whole-word hits in the name over city or partial-word hits
+            return (-sum(t in docs[d]["name_tokens"] for t in tokens), rank_of[d])
+        matches += sorted(candidates.tolist(), key=sort_key)[:limit - len(matches)]
+
+    # Typo tolerance: nothing matched as typed, so fall back to trigram overlap
+    if not matches:
+        matches = _fuzzy_docs(index, tokens, limit)
+
+    return [index["docs"][d]["record"] for d in matches]
@@ -0,0 +1,91 @@
+"""
+Offline "similar colleges" neighbor table.
+
+Computes the top-K nearest institutions in the encoded feature space for every
+Unit ID and stores them in a compact .npz table, so the API can answer
+"schools like this one" with a table lookup instead of a full scan.
+
+Run it after the dataset changes:
+
+    python similar_colleges.py [--k 20] [--jobs -1]
+"""
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+
+SIMILAR_TABLE_PATH = "processed_data/similar_colleges.npz"
+DEFAULT_K = 20
+
+
+def build_neighbor_table(X, unit_ids, k=DEFAULT_K, n_jobs=-1):
+    """Return (unit_ids, neighbors, distances) for every row of X.
+
+    `neighbors` holds row positions into `unit_ids` (self excluded), ordered
+    nearest first. The search is fanned out across cores with n_jobs.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    k = min(k, len(X) - 1)
+    nn = NearestNeighbors(n_neighbors=k, metric="euclidean", n_jobs=n_jobs)
+    nn.fit(X)
+    # Querying without X makes sklearn skip each point's own match
+    distances, neighbors = nn.kneighbors()
+    return (
+        np.asarray(unit_ids, dtype=np.int64),
+        neighbors.astype(np.int32),
+        distances.astype(np.float32),
+    )
+
+
+def feature_version(X):
+    """Short hash of the feature matrix a table is built from."""
+    return hashlib.sha256(np.ascontiguousarray(X, dtype=np.float64).tobytes()).hexdigest()[:12]
+
+
+def save_neighbor_table(path, unit_ids, neighbors, distances, version):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, unit_ids=unit_ids, neighbors=neighbors, distances=distances, version=version)
+
+
+def load_neighbor_table(path, expected_unit_ids=None, expected_version=None):
+    """Load a saved table, or return None if it is missing or stale.
+
+    A table is stale when its Unit IDs or the feature matrix it was built
+    from (`feature_version`) no longer match the running model.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as table:
+        unit_ids = table["unit_ids"]
+        neighbors = table["neighbors"]
+        distances = table["distances"]
+        version = str(table["version"]) if "version" in table.files else None
+    if expected_unit_ids is not None and not np.array_equal(unit_ids, expected_unit_ids):
+        return None
+    if expected_version is not None and version != expected_version:
+        return None
+    return unit_ids, neighbors, distances
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the similar-colleges neighbor table.")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help="neighbors stored per college")
+    parser.add_argument("--jobs", type=int, default=-1, help="parallel jobs (-1 = all cores)")
+    parser.add_argument("--out", default=SIMILAR_TABLE_PATH)
+    args = parser.parse_args()
+
+    # Importing the API builds the same encoded matrix the server scores against
+    import api
+
+    start = time.perf_counter()
+    unit_ids, neighbors, distances = build_neighbor_table(
+        api.knn._fit_X, api.model_unit_ids, k=args.k, n_jobs=args.jobs
+    )
+    save_neighbor_table(args.out, unit_ids, neighbors, distances, feature_version(api.knn._fit_X))
+    elapsed = time.perf_counter() - start
+
+    print(f"Saved {neighbors.shape[0]} x {neighbors.shape[1]} neighbors to '{args.out}' "
+          f"({os.path.getsize(args.out) / 1024:.1f} KB) in {elapsed:.2f}s")
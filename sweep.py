@@ -0,0 +1,294 @@
+"""
+Weight-sensitivity and ranking-stability sweep over the hybrid scoring constants.
+
+Scores a population of synthetic student profiles under every combination of
+ALPHA, BETA, STATE_PREFERENCE_BONUS, MSI_PREFERENCE_BONUS and the grad-rate /
+retention bonus multipliers, and compares each configuration's rankings with
+the current constants in api.py:
+
+- overlap@N: share of the reference top N that the configuration also ranks in its top N
+- spearman:  rank correlation of the full rankings
+
+Scoring is batched: for a chunk of profiles the weighted-score components and
+KNN similarities are computed once as (profiles x colleges) matrices, and each
+configuration is a cheap linear combination of them. Chunks are fanned out
+across a process pool; the feature matrices live in shared memory that every
+worker maps read-only.
+
+    python sweep.py --profiles 2000 --alpha 0.4 0.6 0.8 --state-bonus 7500 15000 30000
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.metrics import euclidean_distances
+
+PARAMS = ["alpha", "beta", "state_bonus", "msi_bonus", "grad_mult", "ret_mult"]
+
+# Shared read-only arrays, attached once per worker process
+_shared = {}
+_shared_blocks = []
+
+
+def build_features():
+    """Arrays the sweep needs from the served model (imports api, so run once in the parent)."""
+    import api
+
+    m = api.df_model
+    cols = list(api.df_encoded.columns)
+    fill = m[api.numeric_features].mean()
+    q0 = np.zeros(len(cols))
+    q0[[cols.index(f) for f in api.numeric_features]] = api.scaler.transform(fill.to_frame().T)[0]
+
+    states = m["State Abbreviation"].cat.categories.tolist()
+    state_dummy_col = np.array([
+        cols.index(f"State Abbreviation_{s}") if f"State Abbreviation_{s}" in cols else -1 for s in states
+    ])
+
+    # Query encoder: the five numeric features knn_similarity fills from the profile
+    query_features = [
+        "Net Price",
+        "Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total",
+        "First-Time, Full-Time Retention Rate",
+        "Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years",
+        "Affordability Gap (net price minus income earned working 10 hrs at min wage)",
+    ]
+    scaler_pos = [api.numeric_features.index(f) for f in query_features]
+
+    features = {
+        "X": np.ascontiguousarray(api.knn._fit_X, dtype=np.float64),
+        "q0": q0,
+        "query_cols": np.array([cols.index(f) for f in query_features]),
+        "query_mean": api.scaler.mean_[scaler_pos],
+        "query_scale": api.scaler.scale_[scaler_pos],
+        "msi_cols": np.array([cols.index(f) for f in api.binary_features]),
+        "state_dummy_col": state_dummy_col,
+        "net_price": m["Net Price"].to_numpy(np.float64),
+        "retention": m["First-Time, Full-Time Retention Rate"].to_numpy(np.float64),
+        "grad_rate": m["Bachelor's Degree Graduation Rate Bachelor Degree Within 6 Years - Total"].to_numpy(np.float64),
+        "pell_grad_rate": m["Percent Full-time, First-time, Pell Grant Recipients Receiving an Award - 6 Years"].to_numpy(np.float64),
+        "gap": m["Affordability Gap (net price minus income earned working 10 hrs at min wage)"].to_numpy(np.float64),
+        "msi_flags": m[api.binary_features].to_numpy(np.float64),
+        "state_code": m["State Abbreviation"].cat.codes.to_numpy(np.int64),
+    }
+    reference = {
+        "alpha": api.ALPHA,
+        "beta": api.BETA,
+        "state_bonus": api.STATE_PREFERENCE_BONUS,
+        "msi_bonus": api.MSI_PREFERENCE_BONUS,
+        "grad_mult": api.GRAD_RATE_BONUS_MULTIPLIER,
+        "ret_mult": api.RETENTION_BONUS_MULTIPLIER,
+    }
+    return features, reference, len(states)
+
+
+def share_arrays(arrays):
+    """Copy arrays into shared memory; returns (blocks to keep alive, specs for workers)."""
+    blocks, specs = [], {}
+    for name, arr in arrays.items():
+        block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[...] = arr
+        blocks.append(block)
+        specs[name] = (block.name, arr.shape, arr.dtype.str)
+    return blocks, specs
+
+
+def attach_arrays(specs):
+    """Worker initializer: map the shared arrays read-only."""
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _shared_blocks.append(block)
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        arr.flags.writeable = False
+        _shared[name] = arr
+
+
+def generate_profiles(n, n_states, seed):
+    """Synthetic students drawn from the ranges of the frontend sliders."""
+    rng = np.random.default_rng(seed)
+    return {
+        "max_net_price": rng.integers(5, 51, n) * 1000.0,
+        "min_grad_rate": np.clip(np.round(rng.normal(40, 15, n) / 5) * 5, 0, 100),
+        "min_retention": np.clip(np.round(rng.normal(70, 10, n) / 5) * 5, 0, 100),
+        "msi": rng.random((n, 7)) < 0.1,
+        "state": np.where(rng.random(n) < 0.5, rng.integers(0, n_states, n), -1),
+        "focus_pell": rng.random(n) < 0.3,
+    }
+
+
+def _standardize(scores):
+    """Row-wise StandardScaler, matching the per-request scaling in api.py."""
+    std = scores.std(axis=1, keepdims=True)
+    std[std == 0] = 1.0
+    return (scores - scores.mean(axis=1, keepdims=True)) / std
+
+
+def score_components(p):
+    """(profiles x colleges) components whose weighted sum is compute_weighted_scores()."""
+    f = _shared
+    focus = p["focus_pell"][:, None]
+    grad = np.where(focus, f["pell_grad_rate"][None, :], f["grad_rate"][None, :])
+    net = f["net_price"][None, :]
+
+    base = (
+        -1.0 * net
+        + f["retention"][None, :]
+        + grad
+        - 0.3 * f["gap"][None, :]
+        - np.maximum(net - p["max_net_price"][:, None], 0)
+    )
+    grad_bonus = np.maximum(grad - p["min_grad_rate"][:, None], 0)
+    ret_bonus = np.maximum(f["retention"][None, :] - p["min_retention"][:, None], 0)
+    msi_count = p["msi"].astype(np.float64) @ f["msi_flags"].T
+    state_match = (f["state_code"][None, :] == p["state"][:, None]).astype(np.float64)
+    return base, grad_bonus, ret_bonus, msi_count, state_match
+
+
+def knn_scores(p):
+    """Batched knn_similarity(): one query vector per profile against all colleges."""
+    f = _shared
+    n = len(p["max_net_price"])
+    Q = np.tile(f["q0"], (n, 1))
+    raw = np.column_stack([
+        p["max_net_price"], p["min_grad_rate"], p["min_retention"], p["min_grad_rate"], p["max_net_price"],
+    ])
+    Q[:, f["query_cols"]] = (raw - f["query_mean"]) / f["query_scale"]
+    Q[:, f["msi_cols"]] = p["msi"]
+    has_state = p["state"] >= 0
+    dummy = np.where(has_state, f["state_dummy_col"][np.maximum(p["state"], 0)], -1)
+    rows = np.flatnonzero(dummy >= 0)
+    Q[rows, dummy[rows]] = 1.0
+    return 1 / (1 + euclidean_distances(Q, f["X"]))
+
+
+def _ranks(scores):
+    ranks = np.empty_like(scores)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    np.put_along_axis(ranks, order, np.arange(scores.shape[1], dtype=scores.dtype)[None, :], axis=1)
+    return ranks
+
+
+def _top_n(scores, n):
+    return np.argpartition(-scores, n - 1, axis=1)[:, :n]
+
+
+def evaluate_chunk(profiles, configs, reference, top_n):
+    """Per-config sums of overlap@N and Spearman over one chunk of profiles."""
+    base, grad_bonus, ret_bonus, msi_count, state_match = score_components(profiles)
+    scaled_knn = _standardize(knn_scores(profiles))
+
+    def final_scores(c):
+        weighted = (
+            base
+            + c["grad_mult"] * grad_bonus
+            + c["ret_mult"] * ret_bonus
+            + c["msi_bonus"] * msi_count
+            + c["state_bonus"] * state_match
+        )
+        return c["alpha"] * _standardize(weighted) + c["beta"] * scaled_knn
+
+    ref_scores = final_scores(reference)
+    ref_top = _top_n(ref_scores, top_n)
+    ref_ranks = _ranks(ref_scores)
+    ref_ranks -= ref_ranks.mean(axis=1, keepdims=True)
+    ref_norm = np.sqrt((ref_ranks ** 2).sum(axis=1))
+
+    sums = np.zeros((len(configs), 2))
+    for i, c in enumerate(configs):
+        scores = final_scores(c)
+        top = _top_n(scores, top_n)
+        overlap = (ref_top[:, :, None] == top[:, None, :]).any(axis=2).sum(axis=1) / top_n
+        ranks = _ranks(scores)
+        ranks -= ranks.mean(axis=1, keepdims=True)
+        spearman = (ranks * ref_ranks).sum(axis=1) / (np.sqrt((ranks ** 2).sum(axis=1)) * ref_norm)
+        sums[i] = overlap.sum(), spearman.sum()
+    return sums
+
+
+def config_grid(args, reference):
+    values = {
+        "alpha": args.alpha,
+        "beta": args.beta,
+        "state_bonus": args.state_bonus,
+        "msi_bonus": args.msi_bonus,
+        "grad_mult": args.grad_mult,
+        "ret_mult": args.ret_mult,
+    }
+    configs = []
+    for combo in itertools.product(*[values[k] or [None] for k in PARAMS]):
+        c = dict(zip(PARAMS, combo))
+        if c["beta"] is None:
+            c["beta"] = round(1 - c["alpha"], 6)  # keep the blend summing to 1 like 0.6/0.4
+        for k in PARAMS:
+            if c[k] is None:
+                c[k] = reference[k]
+        configs.append(c)
+    return configs
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep hybrid scoring constants and report ranking stability.")
+    parser.add_argument("--profiles", type=int, default=2000, help="synthetic student profiles")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--alpha", type=float, nargs="+", default=[0.4, 0.5, 0.6, 0.7, 0.8])
+    parser.add_argument("--beta", type=float, nargs="+", help="default: 1 - alpha")
+    parser.add_argument("--state-bonus", type=float, nargs="+", default=[7500.0, 15000.0, 30000.0])
+    parser.add_argument("--msi-bonus", type=float, nargs="+", default=[2500.0, 5000.0, 10000.0])
+    parser.add_argument("--grad-mult", type=float, nargs="+", default=[5.0, 10.0, 20.0])
+    parser.add_argument("--ret-mult", type=float, nargs="+", default=[5.0, 10.0, 20.0])
+    parser.add_argument("--chunk-size", type=int, default=256, help="profiles scored per batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--show", type=int, default=20, help="rows printed, least stable first")
+    parser.add_argument("--json", help="also write all results to this JSON file")
+    args = parser.parse_args()
+
+    features, reference, n_states = build_features()
+    configs = config_grid(args, reference)
+    profiles = generate_profiles(args.profiles, n_states, args.seed)
+    chunks = [
+        {k: v[i:i + args.chunk_size] for k, v in profiles.items()}
+        for i in range(0, args.profiles, args.chunk_size)
+    ]
+    n_colleges = len(features["net_price"])
+    print(f"{len(configs)} configs x {args.profiles} profiles x {n_colleges} colleges "
+          f"on {args.workers} workers...", flush=True)
+
+    blocks, specs = share_arrays(features)
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(args.workers, initializer=attach_arrays, initargs=(specs,)) as pool:
+            futures = [pool.submit(evaluate_chunk, chunk, configs, reference, args.top_n) for chunk in chunks]
+            totals = sum(f.result() for f in futures)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    elapsed = time.perf_counter() - start
+
+    results = [
+        {**c, "overlap": overlap / args.profiles, "spearman": spearman / args.profiles}
+        for c, (overlap, spearman) in zip(configs, totals)
+    ]
+    results.sort(key=lambda r: r["overlap"])
+
+    header = (f"{'alpha':>6} {'beta':>6} {'state':>8} {'msi':>8} {'grad x':>7} {'ret x':>6} "
+              f"{f'overlap@{args.top_n}':>11} {'spearman':>9}")
+    print(header)
+    print("-" * len(header))
+    for r in results[:args.show]:
+        print(f"{r['alpha']:>6.2f} {r['beta']:>6.2f} {r['state_bonus']:>8.0f} {r['msi_bonus']:>8.0f} "
+              f"{r['grad_mult']:>7.1f} {r['ret_mult']:>6.1f} {r['overlap']:>11.3f} {r['spearman']:>9.4f}")
+
+    evaluations = len(configs) * args.profiles
+    print(f"\n{evaluations:,} profile x config evaluations in {elapsed:.1f}s "
+          f"({evaluations / elapsed:,.0f}/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"reference": reference, "top_n": args.top_n, "profiles": args.profiles,
+                       "seconds": elapsed, "results": results}, f, indent=2)